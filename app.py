@@ -4,81 +4,81 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import re
+import os
+import multiprocessing
 from collections import Counter
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-import seaborn as sns
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 import io
 import base64
+from text_analysis import analyze_batch
 
-# 페이지 설정
-st.set_page_config(
-    page_title="고객 피드백 분석",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# 병렬 처리 설정 (행 수가 적으면 프로세스 생성 비용이 더 큼)
+PARALLEL_MIN_ROWS = 5000
 
-# 한글 폰트 설정
-plt.rcParams['font.family'] = 'DejaVu Sans'
-plt.rcParams['axes.unicode_minus'] = False
+# 사용 가능한 코어 수 계산 함수
+def get_worker_count():
+    """이 프로세스가 사용할 수 있는 CPU 코어 수"""
+    # cpu_count()는 affinity 제한을 반영하지 않으므로 가능하면 sched_getaffinity 사용
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
 
-# 감성 분석 함수 (간단한 키워드 기반)
-def analyze_sentiment(text):
-    """간단한 키워드 기반 감성 분석"""
-    if pd.isna(text) or text == '':
-        return '중립'
-    
-    text = str(text).lower()
-    
-    # 긍정 키워드
-    positive_words = ['좋다', '좋은', '만족', '훌륭', '최고', '감사', '추천', '훌륭한', 
-                     '빠르다', '빠른', '편리', '편한', '친절', '도움', '해결', '완벽']
-    
-    # 부정 키워드
-    negative_words = ['나쁘다', '나쁜', '불만', '문제', '느리다', '느린', '불편', '어려움',
-                     '실망', '화나다', '짜증', '복잡', '오류', '오래', '지연', '불친절']
-    
-    positive_count = sum(1 for word in positive_words if word in text)
-    negative_count = sum(1 for word in negative_words if word in text)
-    
-    if positive_count > negative_count:
-        return '긍정'
-    elif negative_count > positive_count:
-        return '부정'
-    else:
-        return '중립'
+# 프로세스 풀 생성 함수
+@st.cache_resource
+def get_process_pool():
+    """텍스트 분석용 프로세스 풀 (세션 간 공유)"""
+    # 멀티스레드인 Streamlit 서버를 fork하지 않도록 spawn 사용 (풀이 캐시되므로 시작 비용은 한 번만 발생)
+    return ProcessPoolExecutor(
+        max_workers=get_worker_count(),
+        mp_context=multiprocessing.get_context('spawn')
+    )
 
-# 키워드 추출 함수
-def extract_keywords(text, top_n=20):
-    """텍스트에서 키워드 추출"""
-    if pd.isna(text) or text == '':
-        return []
+# 피드백 분석 함수 (감성 분석 + 키워드 추출)
+# 대용량 Series는 Streamlit 기본 해시가 일부 행만 샘플링하므로 전체 행을 해시
+@st.cache_data(
+    show_spinner=False,
+    hash_funcs={pd.Series: lambda series: pd.util.hash_pandas_object(series).sum()}
+)
+def analyze_feedback(text_data):
+    """텍스트 컬럼 전체의 감성 라벨과 키워드 빈도를 한 번의 순회로 계산"""
+    # 컬럼 전체를 한 번에 소문자화
+    texts = text_data.fillna('').astype(str).str.lower().tolist()
     
-    # 한글, 영문, 숫자만 추출
-    text = re.sub(r'[^가-힣a-zA-Z0-9\s]', ' ', str(text))
-    words = text.split()
+    workers = get_worker_count()
     
-    # 불용어 제거 (간단한 버전)
-    stopwords = ['그', '이', '저', '것', '들', '의', '가', '을', '를', '에', '와', '과', '로', '으로',
-                 '는', '은', '도', '만', '부터', '까지', '에서', '에게', '한테', '께', '서', '부터']
+    # 코어가 하나뿐이면 병렬 처리는 오버헤드만 추가됨
+    if len(texts) > PARALLEL_MIN_ROWS and workers > 1:
+        # 코어 수만큼 나누어 병렬 처리
+        batch_size = -(-len(texts) // workers)
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        try:
+            labels = []
+            keyword_counts = Counter()
+            for batch_labels, batch_counts in get_process_pool().map(analyze_batch, batches):
+                labels.extend(batch_labels)
+                keyword_counts.update(batch_counts)
+        except BrokenProcessPool:
+            # 깨진 풀이 캐시에 남지 않도록 비우고 현재 프로세스에서 처리
+            get_process_pool.clear()
+            labels, keyword_counts = analyze_batch(texts)
+    else:
+        labels, keyword_counts = analyze_batch(texts)
     
-    words = [word for word in words if len(word) > 1 and word not in stopwords]
+    sentiments = pd.Series(labels, index=text_data.index, dtype='category')
     
-    return words
+    return sentiments, keyword_counts
 
 # 워드클라우드 생성 함수
-def create_wordcloud(text_data):
-    """워드클라우드 생성"""
-    all_text = ' '.join(text_data.dropna().astype(str))
-    words = extract_keywords(all_text, top_n=100)
-    
-    if not words:
+@st.cache_data(show_spinner=False)
+def create_wordcloud(word_freq):
+    """키워드 빈도로부터 워드클라우드 생성"""
+    if not word_freq:
         return None
     
-    word_freq = Counter(words)
+    # 워드클라우드를 그릴 때만 로드 (앱 시작 시간 단축)
+    from wordcloud import WordCloud
     
     # 워드클라우드 생성
     wordcloud = WordCloud(
@@ -92,8 +92,25 @@ def create_wordcloud(text_data):
     
     return wordcloud
 
+# 파일 읽기 함수
+@st.cache_data(show_spinner=False)
+def load_data(file_bytes, file_name):
+    """업로드된 파일 내용을 DataFrame으로 읽기"""
+    if file_name.endswith('.csv'):
+        return pd.read_csv(io.BytesIO(file_bytes))
+    else:
+        return pd.read_excel(io.BytesIO(file_bytes))
+
 # 메인 앱
 def main():
+    # 페이지 설정 (spawn 워커가 app.py를 import할 때 실행되지 않도록 main 안에서 호출)
+    st.set_page_config(
+        page_title="고객 피드백 분석",
+        page_icon="📊",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
     st.title("📊 고객 피드백 분석 대시보드")
     st.markdown("---")
     
@@ -112,10 +129,7 @@ def main():
     
     if uploaded_file is not None:
         try:
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
+            df = load_data(uploaded_file.getvalue(), uploaded_file.name)
             
             st.sidebar.success(f"✅ 파일 업로드 완료: {uploaded_file.name}")
             st.sidebar.info(f"📊 총 {len(df)}개의 피드백 데이터")
@@ -124,7 +138,8 @@ def main():
             st.sidebar.error(f"❌ 파일 읽기 오류: {str(e)}")
             df = None
     elif use_sample:
-        # 샘플 데이터 생성
+        # 샘플 데이터 생성 (고정 시드로 재실행 시에도 동일한 데이터 유지)
+        rng = np.random.default_rng(0)
         sample_data = {
             'date': pd.date_range('2024-01-01', periods=100, freq='D'),
             'feedback': [
@@ -139,8 +154,8 @@ def main():
                 '로그인이 자꾸 안되어서 불편했습니다.',
                 '상품 설명이 자세해서 구매 결정에 도움이 되었습니다.'
             ] * 10,
-            'rating': np.random.randint(1, 6, 100),
-            'category': np.random.choice(['배송', '품질', '서비스', '가격', '기타'], 100)
+            'rating': rng.integers(1, 6, 100),
+            'category': rng.choice(['배송', '품질', '서비스', '가격', '기타'], 100)
         }
         df = pd.DataFrame(sample_data)
         st.sidebar.info("📊 샘플 데이터를 사용합니다")
@@ -173,20 +188,22 @@ def main():
             df[date_column] = pd.to_datetime(df[date_column], errors='coerce')
         
         # 데이터 미리보기
-        st.dataframe(df.head(10), use_container_width=True)
+        st.dataframe(df.iloc[:10], use_container_width=True)
         
         # 감성 분석 실행
         st.header("🎭 감성 분석 결과")
         
         # 감성 분석
-        df['sentiment'] = df[text_column].apply(analyze_sentiment)
+        df['sentiment'], keyword_counts = analyze_feedback(df[text_column])
+        
+        # 감성 분포 집계 (차트와 요약 통계에서 공유)
+        sentiment_counts = df['sentiment'].value_counts()
         
         # 감성 분포 시각화
         col1, col2 = st.columns(2)
         
         with col1:
             # 감성 분포 파이 차트
-            sentiment_counts = df['sentiment'].value_counts()
             fig_pie = px.pie(
                 values=sentiment_counts.values,
                 names=sentiment_counts.index,
@@ -211,13 +228,7 @@ def main():
         # 키워드 분석
         st.header("🔍 키워드 분석")
         
-        # 키워드 추출
-        all_keywords = []
-        for text in df[text_column].dropna():
-            keywords = extract_keywords(text)
-            all_keywords.extend(keywords)
-        
-        keyword_counts = Counter(all_keywords)
+        # 상위 키워드 (감성 분석과 함께 추출됨)
         top_keywords = dict(keyword_counts.most_common(20))
         
         col1, col2 = st.columns(2)
@@ -239,8 +250,14 @@ def main():
         with col2:
             # 워드클라우드
             st.subheader("워드클라우드")
-            wordcloud = create_wordcloud(df[text_column])
+            wordcloud = create_wordcloud(dict(keyword_counts.most_common(200)))
             if wordcloud:
+                import matplotlib.pyplot as plt
+                
+                # 한글 폰트 설정
+                plt.rcParams['font.family'] = 'DejaVu Sans'
+                plt.rcParams['axes.unicode_minus'] = False
+                
                 fig_wc, ax = plt.subplots(figsize=(10, 5))
                 ax.imshow(wordcloud, interpolation='bilinear')
                 ax.axis('off')
@@ -253,8 +270,9 @@ def main():
             st.header("📅 시간별 분석")
             
             # 월별 감성 분포
-            df['month'] = df[date_column].dt.to_period('M')
-            monthly_sentiment = df.groupby(['month', 'sentiment']).size().unstack(fill_value=0)
+            # 월 단위로 내림한 datetime64 값을 사용해 Plotly가 그대로 날짜 축으로 처리하도록 함
+            month = df[date_column].dt.to_period('M').dt.to_timestamp()
+            monthly_sentiment = pd.crosstab(month, df['sentiment'])
             
             fig_monthly = px.line(
                 monthly_sentiment,
@@ -267,55 +285,61 @@ def main():
         # 상세 분석
         st.header("📊 상세 분석")
         
-        # 감성별 피드백 샘플
+        # 감성별 피드백 샘플 (한 번의 그룹화로 감성별 상위 10개 추출)
+        sentiment_samples = {
+            label: feedback.head(10).tolist()
+            for label, feedback in df[text_column].groupby(df['sentiment'], observed=True, sort=False)
+        }
+        
         sentiment_tabs = st.tabs(['긍정 피드백', '부정 피드백', '중립 피드백'])
         
         with sentiment_tabs[0]:
-            positive_feedback = df[df['sentiment'] == '긍정'][text_column].head(10)
-            for i, feedback in enumerate(positive_feedback, 1):
-                st.write(f"{i}. {feedback}")
+            st.markdown('\n'.join(
+                f"{i}. {feedback}" for i, feedback in enumerate(sentiment_samples.get('긍정', []), 1)
+            ))
         
         with sentiment_tabs[1]:
-            negative_feedback = df[df['sentiment'] == '부정'][text_column].head(10)
-            for i, feedback in enumerate(negative_feedback, 1):
-                st.write(f"{i}. {feedback}")
+            st.markdown('\n'.join(
+                f"{i}. {feedback}" for i, feedback in enumerate(sentiment_samples.get('부정', []), 1)
+            ))
         
         with sentiment_tabs[2]:
-            neutral_feedback = df[df['sentiment'] == '중립'][text_column].head(10)
-            for i, feedback in enumerate(neutral_feedback, 1):
-                st.write(f"{i}. {feedback}")
+            st.markdown('\n'.join(
+                f"{i}. {feedback}" for i, feedback in enumerate(sentiment_samples.get('중립', []), 1)
+            ))
         
         # 요약 통계
         st.header("📈 요약 통계")
         
+        # 감성 비율
+        sentiment_rates = sentiment_counts / len(df) * 100
+        
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.metric("총 피드백 수", len(df))
         
         with col2:
-            positive_rate = (df['sentiment'] == '긍정').sum() / len(df) * 100
-            st.metric("긍정 비율", f"{positive_rate:.1f}%")
+            st.metric("긍정 비율", f"{sentiment_rates.get('긍정', 0):.1f}%")
         
         with col3:
-            negative_rate = (df['sentiment'] == '부정').sum() / len(df) * 100
-            st.metric("부정 비율", f"{negative_rate:.1f}%")
+            st.metric("부정 비율", f"{sentiment_rates.get('부정', 0):.1f}%")
         
         with col4:
-            neutral_rate = (df['sentiment'] == '중립').sum() / len(df) * 100
-            st.metric("중립 비율", f"{neutral_rate:.1f}%")
+            st.metric("중립 비율", f"{sentiment_rates.get('중립', 0):.1f}%")
         
         # 다운로드 기능
         st.header("💾 결과 다운로드")
         
-        # 분석 결과를 CSV로 다운로드
-        result_df = df.copy()
-        result_df['감성분석결과'] = result_df['sentiment']
+        # 분석 결과를 CSV로 다운로드 (전체 복사 없이 결과 컬럼만 추가)
+        df['감성분석결과'] = df['sentiment']
         
-        csv = result_df.to_csv(index=False, encoding='utf-8-sig')
+        # 문자열을 거치지 않고 바로 바이트 버퍼에 기록
+        csv_buffer = io.BytesIO()
+        df.to_csv(csv_buffer, index=False, encoding='utf-8-sig')
         st.download_button(
             label="📥 분석 결과 CSV 다운로드",
-            data=csv,
+            data=csv_buffer.getvalue(),
             file_name=f"feedback_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
             mime="text/csv"
         )
@@ -0,0 +1,104 @@
+"""피드백 텍스트 분석 함수 (감성 분석, 키워드 추출)
+
+Streamlit에 의존하지 않는 순수 함수만 모아 두어
+멀티프로세싱 워커에서도 import 할 수 있도록 합니다.
+"""
+import re
+from collections import Counter
+import ahocorasick
+import pandas as pd
+
+# 감성 분석 키워드
+# 긍정 키워드
+positive_words = ('좋다', '좋은', '만족', '훌륭', '최고', '감사', '추천', '훌륭한',
+                  '빠르다', '빠른', '편리', '편한', '친절', '도움', '해결', '완벽')
+
+# 부정 키워드
+negative_words = ('나쁘다', '나쁜', '불만', '문제', '느리다', '느린', '불편', '어려움',
+                  '실망', '화나다', '짜증', '복잡', '오류', '오래', '지연', '불친절')
+
+# 키워드별 극성 (긍정 +1, 부정 -1)
+sentiment_polarity = {word: 1 for word in positive_words}
+sentiment_polarity.update({word: -1 for word in negative_words})
+
+# 감성 키워드 오토마톤 생성 함수
+def build_sentiment_automaton():
+    """긍정/부정 키워드를 하나의 Aho-Corasick 오토마톤으로 컴파일"""
+    automaton = ahocorasick.Automaton()
+    for word, polarity in sentiment_polarity.items():
+        automaton.add_word(word, (polarity, word))
+    automaton.make_automaton()
+    return automaton
+
+# 프로세스당 한 번만 생성
+sentiment_automaton = build_sentiment_automaton()
+
+def sentiment_score(text):
+    """소문자화된 텍스트에서 (긍정 키워드 수 - 부정 키워드 수) 계산"""
+    # 가장 짧은 키워드(2글자)보다 짧으면 탐색 생략
+    if len(text) < 2:
+        return 0
+    
+    # 키워드당 1회만 카운트 (겹치는 키워드도 모두 매칭됨)
+    matched = {value for _, value in sentiment_automaton.iter(text)}
+    return sum(polarity for polarity, _ in matched)
+
+def sentiment_label(score):
+    """감성 점수를 긍정/부정/중립 라벨로 변환"""
+    if score > 0:
+        return '긍정'
+    elif score < 0:
+        return '부정'
+    else:
+        return '중립'
+
+# 감성 분석 함수 (간단한 키워드 기반)
+def analyze_sentiment(text):
+    """간단한 키워드 기반 감성 분석 (단일 텍스트용 대체 경로, 대시보드는 analyze_batch 사용)"""
+    if pd.isna(text):
+        return '중립'
+    
+    return sentiment_label(sentiment_score(str(text).lower()))
+
+# 키워드 분리용 정규식 (한글, 영문, 숫자 외 문자의 연속)
+separator_pattern = re.compile(r'[^가-힣a-zA-Z0-9]+')
+
+# 불용어 (간단한 버전)
+stopwords = frozenset(['그', '이', '저', '것', '들', '의', '가', '을', '를', '에', '와', '과', '로', '으로',
+                       '는', '은', '도', '만', '부터', '까지', '에서', '에게', '한테', '께', '서', '부터'])
+
+# 공통 토큰 추출 함수
+def extract_tokens(text):
+    """소문자화된 텍스트에서 불용어를 제외한 키워드 목록 추출"""
+    # 2글자 미만이면 추출될 단어도 없음
+    if len(text) < 2:
+        return []
+    
+    # 한글, 영문, 숫자만 추출하면서 불용어 제거
+    return [word for word in separator_pattern.split(text)
+            if len(word) > 1 and word not in stopwords]
+
+# 키워드 추출 함수
+def extract_keywords(text):
+    """텍스트에서 키워드 추출 (단일 텍스트용 대체 경로, 대시보드는 analyze_batch 사용)"""
+    if pd.isna(text):
+        return []
+    
+    return extract_tokens(str(text).lower())
+
+# 감성 분석 + 키워드 추출 통합 함수
+def analyze_row(text):
+    """소문자화된 텍스트에서 감성 라벨과 키워드 목록을 함께 계산"""
+    return sentiment_label(sentiment_score(text)), extract_tokens(text)
+
+def analyze_batch(texts):
+    """소문자화된 텍스트 묶음의 감성 라벨 목록과 키워드 빈도 계산 (멀티프로세싱 작업 단위)"""
+    # 행별 키워드 목록 대신 묶음 단위 Counter를 반환해 프로세스 간 전송량을 줄임
+    labels = []
+    keyword_counts = Counter()
+    for text in texts:
+        label, words = analyze_row(text)
+        labels.append(label)
+        keyword_counts.update(words)
+    
+    return labels, keyword_counts